@@ -1,664 +1,1634 @@
-"""
-alass4Container - A tool that allows you to run alass directly on an MKV container, without needing to extract the SRT files. 
-
-This script uses mkvmerge, mkvextract and alass to extract subtitles from the selected MKV file, synchronize 
-them, and create a new MKV with corrected subtitles.
-"""
-
-import os
-import tempfile
-import subprocess
-import sys
-import json
-import shutil
-import re
-from pathlib import Path
-from typing import List, Tuple, Dict, Optional, Any
-from dataclasses import dataclass, field
-
-# Third-party imports
-import tkinter as tk
-from tkinter import filedialog, simpledialog, messagebox
-from rich.console import Console
-from rich.progress import Progress, TextColumn, BarColumn, SpinnerColumn, TimeRemainingColumn
-from rich.panel import Panel
-from rich.text import Text
-
-# Constants
-DEFAULT_SPLIT_PENALTY = 7
-SUBTITLE_EXTENSIONS = {
-    "ass": "ass",
-    "ssa": "ass",
-    "srt": "srt",
-    "vobsub": "idx"
-}
-
-@dataclass
-class ToolPaths:
-    """Class to store paths to external tools."""
-    mkvmerge: Optional[str] = None
-    mkvextract: Optional[str] = None
-    alass: Optional[str] = None
-    
-    def all_found(self) -> bool:
-        """Check if all required tools were found."""
-        return all([self.mkvmerge, self.mkvextract, self.alass])
-
-@dataclass
-class SubtitleTrack:
-    """Class to store subtitle track information."""
-    track_id: str
-    language: str
-    track_name: str
-    codec: str
-    properties: Dict[str, Any] = field(default_factory=dict)
-    file_path: Optional[str] = None
-    corrected_path: Optional[str] = None
-    
-    @property
-    def extension(self) -> str:
-        """Determine the appropriate file extension based on codec."""
-        for codec_name, ext in SUBTITLE_EXTENSIONS.items():
-            if codec_name in self.codec:
-                return ext
-        return "srt"  # Default to SRT
-
-@dataclass
-class SyncOptions:
-    """Class to store synchronization options."""
-    split_penalty: Optional[float] = None
-    no_splits: bool = False
-
-class AlassContainer:
-    """Main class for the alass4Container application."""
-    
-    def __init__(self):
-        """Initialize the application."""
-        self.console = Console()
-        self.tools = ToolPaths()
-        self.subtitle_tracks: List[SubtitleTrack] = []
-        self.options = SyncOptions()
-        
-        # Create a root window for tkinter dialogs
-        self.root = tk.Tk()
-        self.root.withdraw()  # Hide the main window
-        
-    def find_tool(self, tool_name: str) -> Optional[str]:
-        """
-        Find a tool in PATH or common locations.
-        
-        Args:
-            tool_name: Name of the tool to find
-            
-        Returns:
-            Path to the tool if found, None otherwise
-        """
-        # Try with and without .exe extension for Windows compatibility
-        possible_names = [tool_name]
-        if sys.platform == 'win32':
-            possible_names.append(f"{tool_name}.exe")
-            possible_names.append(f"{tool_name}-cli.exe")  # For alass on Windows
-            
-        # First try to find it in PATH
-        for name in possible_names:
-            path = shutil.which(name)
-            if path:
-                return path
-        
-        # If on Windows, look in common installation directories
-        if sys.platform == 'win32':
-            # Base directories to check
-            common_dirs = [
-                os.path.expandvars("%ProgramFiles%\\MKVToolNix"),
-                os.path.expandvars("%ProgramFiles(x86)%\\MKVToolNix"),
-                os.path.expandvars("%LOCALAPPDATA%\\Programs\\MKVToolNix"),
-                os.path.expandvars("%APPDATA%\\MKVToolNix"),
-                os.path.expandvars("%USERPROFILE%\\AppData\\Local\\MKVToolNix"),
-                os.path.expandvars("%USERPROFILE%\\AppData\\Roaming\\MKVToolNix"),
-                os.path.join(os.getcwd(), "bin"),  # Check in a bin directory in current working directory
-                os.getcwd()  # Check in current directory
-            ]
-            
-            # Add alass-specific directories if searching for alass
-            if tool_name == "alass":
-                common_dirs.extend([
-                    os.path.expandvars("%USERPROFILE%\\Downloads\\alass"),
-                    os.path.expandvars("%USERPROFILE%\\Documents\\alass"),
-                    os.path.expandvars("%USERPROFILE%\\Desktop\\alass"),
-                    os.path.expandvars("%LOCALAPPDATA%\\Programs\\alass"),
-                    os.path.expandvars("%APPDATA%\\alass"),
-                ])
-                
-            for directory in common_dirs:
-                if os.path.exists(directory):
-                    for name in possible_names:
-                        path = os.path.join(directory, name)
-                        if os.path.isfile(path):
-                            return path
-        # I hate this so much
-        # TODO: On non-Windows platforms, could add common install locations here
-        
-        return None
-    
-    def check_tools(self) -> bool:
-        """
-        Check if all required tools are available.
-        
-        Returns:
-            True if all tools are found, False otherwise
-        """
-        missing_tools = []
-        
-        with self.console.status("[cyan]Checking for required tools...[/cyan]", spinner="dots"):
-            # Check for mkvmerge
-            self.tools.mkvmerge = self.find_tool("mkvmerge")
-            if not self.tools.mkvmerge:
-                missing_tools.append("mkvmerge")
-            
-            # Check for mkvextract
-            self.tools.mkvextract = self.find_tool("mkvextract")
-            if not self.tools.mkvextract:
-                missing_tools.append("mkvextract")
-            
-            # Check for alass
-            self.tools.alass = self.find_tool("alass")
-            if not self.tools.alass:
-                # Try alass-cli as an alternative
-                self.tools.alass = self.find_tool("alass-cli")
-                if not self.tools.alass:
-                    missing_tools.append("alass")
-        
-        if missing_tools:
-            missing_str = ", ".join(missing_tools)
-            self.console.print(f"[bold red]Error: Required tools are missing: {missing_str}[/bold red]")
-            self.console.print("[yellow]Paths searched: PATH environment variable and common installation directories.[/yellow]")
-            self.console.print("[yellow]Please make sure mkvtoolnix (mkvmerge, mkvextract) and alass are installed and in your PATH.[/yellow]")
-            
-            messagebox.showerror(
-                "Missing Tools", 
-                f"The following tools are required but could not be found: {missing_str}\n\n"
-                "Please make sure MKVToolNix and alass are installed and in your PATH."
-            )
-            
-            return False
-        
-        # Verify the tools work by checking their version/help output
-        try:
-            # Get version information to display to user
-            mkvmerge_version = subprocess.run(
-                [self.tools.mkvmerge, "--version"], 
-                capture_output=True, text=True, check=True
-            ).stdout.strip().split('\n')[0]
-            
-            mkvextract_version = subprocess.run(
-                [self.tools.mkvextract, "--version"], 
-                capture_output=True, text=True, check=True
-            ).stdout.strip().split('\n')[0]
-            
-            # Check if alass has a --version flag by checking the help output
-            alass_help = subprocess.run(
-                [self.tools.alass, "--help"], 
-                capture_output=True, text=True
-            ).stdout
-            
-            if "--version" in alass_help:
-                alass_version = subprocess.run(
-                    [self.tools.alass, "--version"], 
-                    capture_output=True, text=True, check=True
-                ).stdout.strip()
-            else:
-                alass_version = "Unknown version"
-            
-            # Display found tools
-            self.console.print("[bold green]Required tools found:[/bold green]")
-            self.console.print(f"  [cyan]•[/cyan] MKVMerge: [green]{mkvmerge_version}[/green]")
-            self.console.print(f"  [cyan]•[/cyan] MKVExtract: [green]{mkvextract_version}[/green]")
-            self.console.print(f"  [cyan]•[/cyan] Alass: [green]{alass_version}[/green]")
-            
-            return True
-        except subprocess.SubprocessError as e:
-            self.console.print(f"[bold red]Error running tools: {e}[/bold red]")
-            messagebox.showerror(
-                "Tool Verification Failed", 
-                f"Found the tools, but encountered an error when trying to run them: {e}"
-            )
-            return False
-    
-    def select_mkv_file(self) -> str:
-        """
-        Show a file dialog to select an MKV file.
-        
-        Returns:
-            Path to the selected file
-        """
-        file_path = filedialog.askopenfilename(
-            title="Select MKV file",
-            filetypes=[("MKV files", "*.mkv")]
-        )
-        if not file_path:
-            self.console.print("[yellow]No file selected. Exiting.[/yellow]")
-            sys.exit(0)
-        return file_path
-    
-    def get_subtitle_tracks(self, mkv_file: str) -> List[SubtitleTrack]:
-        """
-        Extract subtitle track information from an MKV file.
-        
-        Args:
-            mkv_file: Path to the MKV file
-            
-        Returns:
-            List of SubtitleTrack objects
-            
-        Raises:
-            SystemExit: If there's an error analyzing the MKV file
-        """
-        try:
-            cmd = [self.tools.mkvmerge, "-J", mkv_file]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            # Parse JSON output
-            info = json.loads(result.stdout)
-            
-            tracks = []
-            
-            # Extract subtitle tracks
-            for track in info.get('tracks', []):
-                if track.get('type') == 'subtitles':
-                    track_id = track.get('id')
-                    properties = track.get('properties', {})
-                    
-                    # Get full language code including region if available
-                    language = properties.get('language', 'und')  # Default to 'und' (undefined) if no language
-                    
-                    # Check for language-specific tags that might contain region info
-                    if 'language_ietf' in properties:
-                        # IETF language tags (like pt-BR, es-419, zh-Hant) take precedence
-                        language = properties.get('language_ietf')
-                    
-                    track_name = properties.get('track_name', '')
-                    codec = track.get('codec', '').lower()
-                    
-                    # Extract track properties for later use
-                    track_props = {
-                        'default_track': properties.get('default_track', False),
-                        'forced_track': properties.get('forced_track', False),
-                        'enabled_track': properties.get('enabled_track', True),
-                        'hearing_impaired': properties.get('hearing_impaired_flag', False),
-                        'visual_impaired': properties.get('visual_impaired_flag', False),
-                        'text_descriptions': properties.get('text_descriptions_flag', False),
-                        'original_language': properties.get('original_language', False),
-                        'commentary': properties.get('commentary_flag', False)
-                    }
-                    
-                    if track_id is not None:
-                        tracks.append(SubtitleTrack(
-                            track_id=str(track_id),
-                            language=language,
-                            track_name=track_name,
-                            codec=codec,
-                            properties=track_props
-                        ))
-            
-            return tracks
-        except subprocess.SubprocessError as e:
-            self.console.print(f"[bold red]Error running mkvmerge: {e}[/bold red]")
-            messagebox.showerror("Error", f"Failed to analyze MKV file: {e}")
-            sys.exit(1)
-        except json.JSONDecodeError as e:
-            self.console.print(f"[bold red]Error parsing mkvmerge output: {e}[/bold red]")
-            messagebox.showerror("Error", f"Failed to parse MKV information: {e}")
-            sys.exit(1)
-    
-    def get_options(self) -> SyncOptions:
-        """
-        Show dialogs to get synchronization options.
-        
-        Returns:
-            SyncOptions object with user preferences
-        """
-        options = SyncOptions()
-        
-        # Ask if the user wants to disable splits entirely first
-        no_splits = messagebox.askyesno(
-            "No Splits Mode",
-            "Do you want to disable splits entirely?\nOnly constant time shifts will be applied.",
-            parent=self.root
-        )
-        
-        if no_splits:
-            options.no_splits = True
-        else:
-            # Only ask about split penalty if we're not disabling splits entirely
-            adjust_split = messagebox.askyesno(
-                "Split Penalty",
-                "Do you want to adjust the split penalty?\nDefault is 7, higher values avoid splits.",
-                parent=self.root
-            )
-            
-            if adjust_split:
-                split_penalty = simpledialog.askfloat(
-                    "Split Penalty Value",
-                    f"Enter a value between 0 and 1000 (default is {DEFAULT_SPLIT_PENALTY}):\nHigher values make splits less likely.",
-                    parent=self.root,
-                    minvalue=0,
-                    maxvalue=1000,
-                    initialvalue=DEFAULT_SPLIT_PENALTY
-                )
-                
-                if split_penalty is not None:
-                    options.split_penalty = split_penalty
-        
-        return options
-    
-    def extract_subtitles(self, mkv_file: str, subtitle_tracks: List[SubtitleTrack], 
-                         temp_dir: str) -> List[SubtitleTrack]:
-        """
-        Extract subtitle files from an MKV file.
-        
-        Args:
-            mkv_file: Path to the MKV file
-            subtitle_tracks: List of SubtitleTrack objects
-            temp_dir: Temporary directory to store extracted files
-            
-        Returns:
-            List of SubtitleTrack objects with file_path set
-        """
-        extracted_tracks = []
-        
-        self.console.print("\n[bold]Extracting subtitles...[/bold]")
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[bold blue]{task.description}[/bold blue]"),
-            BarColumn(bar_width=None),
-            TextColumn("[cyan]{task.completed}/{task.total}[/cyan]"),
-            TimeRemainingColumn(),
-            console=self.console
-        ) as progress:
-            task = progress.add_task("[cyan]Extracting...[/cyan]", total=len(subtitle_tracks))
-            
-            for track in subtitle_tracks:
-                # Skip PGS subtitles which are not supported by alass
-                if "pgs" in track.codec:
-                    progress.update(task, advance=1, description=f"[yellow]Skipping PGS track {track.track_id}...[/yellow]")
-                    continue
-                
-                output_file = os.path.join(temp_dir, f"{track.track_id}.{track.language}.{track.extension}")
-                
-                progress.update(task, description=f"[cyan]Extracting track {track.track_id} ({track.language})...[/cyan]")
-                
-                try:
-                    # Use mkvextract to extract the subtitle track
-                    cmd = [self.tools.mkvextract, "tracks", mkv_file, f"{track.track_id}:{output_file}"]
-                    subprocess.run(cmd, check=True, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
-                    
-                    # Check if the file exists and is not empty
-                    if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
-                        track.file_path = output_file
-                        extracted_tracks.append(track)
-                    else:
-                        progress.update(task, description=f"[red]Failed to extract track {track.track_id}[/red]")
-                except subprocess.SubprocessError as e:
-                    progress.update(task, description=f"[bold red]Error on track {track.track_id}: {e}[/bold red]")
-                
-                progress.update(task, advance=1)
-        
-        return extracted_tracks
-    
-    def synchronize_subtitles(self, mkv_file: str, subtitle_tracks: List[SubtitleTrack], 
-                             temp_dir: str, options: SyncOptions) -> List[SubtitleTrack]:
-        """
-        Synchronize subtitle files with the video using alass.
-        
-        Args:
-            mkv_file: Path to the MKV file
-            subtitle_tracks: List of SubtitleTrack objects with file_path set
-            temp_dir: Temporary directory to store corrected files
-            options: SyncOptions object with synchronization preferences
-            
-        Returns:
-            List of SubtitleTrack objects with corrected_path set
-        """
-        corrected_tracks = []
-        
-        self.console.print("\n[bold]Synchronizing subtitles...[/bold]")
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[bold blue]{task.description}[/bold blue]"),
-            BarColumn(bar_width=None),
-            TextColumn("[cyan]{task.completed}/{task.total}[/cyan]"),
-            TimeRemainingColumn(),
-            console=self.console
-        ) as progress:
-            task = progress.add_task("[cyan]Synchronizing...[/cyan]", total=len(subtitle_tracks))
-            
-            for track in subtitle_tracks:
-                # Define output file path for corrected subtitle
-                corrected_file = os.path.join(temp_dir, f"{track.track_id}.{track.language}.corrected.{track.extension}")
-                
-                progress.update(task, description=f"[cyan]Synchronizing track {track.track_id} ({track.language})...[/cyan]")
-                
-                try:
-                    # Build the alass command
-                    cmd = [self.tools.alass]
-                    
-                    # Add options if specified
-                    if options.split_penalty is not None:
-                        cmd.extend(["--split-penalty", str(options.split_penalty)])
-                    if options.no_splits:
-                        cmd.append("--no-splits")
-                    
-                    # Add the reference, input file, and output file
-                    cmd.extend([mkv_file, track.file_path, corrected_file])
-                    
-                    subprocess.run(cmd, check=True, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
-                    
-                    # Check if the corrected file was created
-                    if os.path.exists(corrected_file) and os.path.getsize(corrected_file) > 0:
-                        track.corrected_path = corrected_file
-                        corrected_tracks.append(track)
-                    else:
-                        progress.update(task, description=f"[red]Failed to synchronize track {track.track_id}[/red]")
-                except subprocess.SubprocessError as e:
-                    progress.update(task, description=f"[bold red]Error on track {track.track_id}: {e}[/bold red]")
-                
-                progress.update(task, advance=1)
-        
-        return corrected_tracks
-    
-    def create_new_mkv(self, mkv_file: str, subtitle_tracks: List[SubtitleTrack]) -> Optional[str]:
-        """
-        Create a new MKV file with the original video and corrected subtitles.
-        
-        Args:
-            mkv_file: Path to the original MKV file
-            subtitle_tracks: List of SubtitleTrack objects with corrected_path set
-            
-        Returns:
-            Path to the new MKV file, or None if creation failed
-        """
-        # Generate output filename based on input file
-        output_file = os.path.splitext(mkv_file)[0] + ".corrected.mkv"
-        
-        # Check if file already exists and warn user
-        if os.path.exists(output_file):
-            overwrite = messagebox.askyesno(
-                "File Exists",
-                f"The output file already exists:\n{output_file}\n\nDo you want to overwrite it?",
-                parent=self.root
-            )
-            if not overwrite:
-                # Let user choose a new filename
-                new_output = filedialog.asksaveasfilename(
-                    title="Save corrected MKV as",
-                    initialfile=os.path.basename(output_file),
-                    defaultextension=".mkv",
-                    filetypes=[("MKV files", "*.mkv")]
-                )
-                if not new_output:
-                    return None
-                output_file = new_output
-        
-        try:
-            # Start building the mkvmerge command to include everything except subtitles
-            cmd = [self.tools.mkvmerge, "-o", output_file, "--no-subtitles", mkv_file]
-            
-            # Add each corrected subtitle file
-            # Sort them based on original track ID to preserve order
-            for track in sorted(subtitle_tracks, key=lambda x: int(x.track_id)):
-                # Start with language and default-track settings
-                cmd_extension = [
-                    "--language", f"0:{track.language}",
-                    "--default-track", "0:no"  # Set default track flag to 'no'
-                ]
-                
-                # Add track name if it exists
-                if track.track_name:
-                    cmd_extension.extend(["--track-name", f"0:{track.track_name}"])
-                
-                # Add other track properties if they're set
-                if track.properties:
-                    # Add forced track flag if set
-                    if track.properties.get('forced_track', False):
-                        cmd_extension.extend(["--forced-track", "0:yes"])
-                    
-                    # Add enabled track flag if not enabled
-                    if not track.properties.get('enabled_track', True):
-                        cmd_extension.extend(["--track-enabled", "0:no"])
-                    
-                    # Add hearing impaired flag if set
-                    if track.properties.get('hearing_impaired', False):
-                        cmd_extension.extend(["--hearing-impaired-flag", "0:yes"])
-                    
-                    # Add visual impaired flag if set
-                    if track.properties.get('visual_impaired', False):
-                        cmd_extension.extend(["--visual-impaired-flag", "0:yes"])
-                    
-                    # Add text descriptions flag if set
-                    if track.properties.get('text_descriptions', False):
-                        cmd_extension.extend(["--text-descriptions-flag", "0:yes"])
-                    
-                    # Add original language flag if set
-                    if track.properties.get('original_language', False):
-                        cmd_extension.extend(["--original-flag", "0:yes"])
-                    
-                    # Add commentary flag if set
-                    if track.properties.get('commentary', False):
-                        cmd_extension.extend(["--commentary-flag", "0:yes"])
-                
-                cmd_extension.append(track.corrected_path)
-                cmd.extend(cmd_extension)
-            
-            # Run the command
-            subprocess.run(cmd, check=True, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
-            
-            return output_file
-        except subprocess.SubprocessError as e:
-            self.console.print(f"[bold red]Error creating new MKV file: {e}[/bold red]")
-            messagebox.showerror("Error", f"Failed to create new MKV: {e}")
-            return None
-    
-    def display_options_panel(self, options: SyncOptions):
-        """Display the selected synchronization options in a panel."""
-        option_text = Text()
-        option_text.append("Synchronization Options:\n", style="bold yellow")
-        if options.no_splits:
-            option_text.append("• No Splits Mode: ", style="bold cyan")
-            option_text.append("Enabled (only constant time shifts will be applied)\n")
-        elif options.split_penalty is not None:
-            option_text.append("• Split Penalty: ", style="bold cyan")
-            option_text.append(f"{options.split_penalty} (higher values avoid splits)\n")
-        else:
-            option_text.append("• Split Penalty: ", style="bold cyan")
-            option_text.append(f"Default ({DEFAULT_SPLIT_PENALTY})\n")
-        self.console.print(Panel(option_text, border_style="cyan"))
-    
-    def run(self):
-        """Run the main application."""
-        # Display app header
-        self.console.print(Panel.fit(
-            "[bold blue]alass4Container[/bold blue]",
-            border_style="cyan"
-        ))
-        
-        # Check for required tools
-        if not self.check_tools():
-            return 1
-        
-        # Select MKV file
-        mkv_file = self.select_mkv_file()
-        self.console.print(f"Selected: [bold green]{mkv_file}[/bold green]")
-        
-        # Get user options
-        self.options = self.get_options()
-        
-        # Display options
-        self.display_options_panel(self.options)
-        
-        # Create temporary directory
-        with tempfile.TemporaryDirectory() as temp_dir:
-            try:
-                # Get subtitle tracks
-                with self.console.status("[cyan]Analyzing MKV file...[/cyan]", spinner="dots"):
-                    self.subtitle_tracks = self.get_subtitle_tracks(mkv_file)
-                
-                if not self.subtitle_tracks:
-                    self.console.print("[bold red]No subtitle tracks found in the MKV file.[/bold red]")
-                    messagebox.showinfo("No Subtitles", "No subtitle tracks found in the selected MKV file.")
-                    return 0
-                
-                # Display found tracks in a nice format
-                self.console.print(f"[bold green]Found {len(self.subtitle_tracks)} subtitle tracks:[/bold green]")
-                for track in self.subtitle_tracks:
-                    self.console.print(
-                        f"  [cyan]•[/cyan] Track [bold]{track.track_id}[/bold]: "
-                        f"Language=[yellow]{track.language}[/yellow], "
-                        f"Name={track.track_name or 'N/A'}, "
-                        f"Codec=[italic]{track.codec}[/italic]"
-                    )
-                
-                # Extract subtitles
-                extracted_tracks = self.extract_subtitles(mkv_file, self.subtitle_tracks, temp_dir)
-                
-                if not extracted_tracks:
-                    self.console.print("[bold red]Failed to extract any subtitle tracks.[/bold red]")
-                    messagebox.showwarning("Extraction Failed", "Failed to extract any subtitle tracks from the MKV file.")
-                    return 1
-                
-                # Synchronize subtitles
-                corrected_tracks = self.synchronize_subtitles(mkv_file, extracted_tracks, temp_dir, self.options)
-                
-                if not corrected_tracks:
-                    self.console.print("[bold red]Failed to synchronize any subtitle tracks.[/bold red]")
-                    messagebox.showwarning("Synchronization Failed", "Failed to synchronize any subtitle tracks.")
-                    return 1
-                
-                # Create new MKV with corrected subtitles
-                self.console.print("\n[bold]Creating new MKV with corrected subtitles...[/bold]")
-                with self.console.status("[cyan]Remuxing MKV file...[/cyan]", spinner="dots"):
-                    output_file = self.create_new_mkv(mkv_file, corrected_tracks)
-                
-                if output_file:
-                    result_text = f"Done! Corrected MKV saved as:\n[bold green]{output_file}[/bold green]"
-                    self.console.print(Panel(result_text, title="[bold green]Success[/bold green]", border_style="green"))
-                    messagebox.showinfo("Success", f"Done! Corrected MKV saved as:\n{output_file}")
-                    return 0
-                else:
-                    self.console.print("[bold red]Failed to create the output MKV file.[/bold red]")
-                    return 1
-            
-            except Exception as e:
-                error_msg = f"An unexpected error occurred: {e}"
-                self.console.print(f"[bold red]{error_msg}[/bold red]")
-                messagebox.showerror("Error", error_msg)
-                return 1
-        
-        return 0
-
-def main():
-    """Main entry point for the application."""
-    app = AlassContainer()
-    return app.run()
-
-if __name__ == "__main__":
+"""
+alass4Container - A tool that allows you to run alass directly on an MKV container, without needing to extract the SRT files. 
+
+This script uses mkvmerge, mkvextract and alass to extract subtitles from the selected MKV file, synchronize 
+them, and create a new MKV with corrected subtitles.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import hashlib
+import os
+import tempfile
+import subprocess
+import sys
+import json
+import shutil
+import re
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from operator import attrgetter
+from pathlib import Path
+from typing import List, Dict, Optional, Any
+from dataclasses import dataclass, field
+
+# Third-party imports. tkinter (and its Tcl/Tk startup cost) is imported
+# lazily inside the functions that actually open dialogs, so headless and
+# batch runs never pay for it.
+from rich.console import Console
+from rich.progress import Progress, TextColumn, BarColumn, SpinnerColumn, TimeRemainingColumn
+from rich.panel import Panel
+from rich.prompt import Confirm, FloatPrompt
+from rich.text import Text
+
+# orjson parses mkvmerge's JSON output several times faster than stdlib
+# json; fall back silently when it isn't installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# ijson streams mkvmerge's JSON straight off the subprocess pipe, so huge
+# identify dumps (attachments, chapters) are never materialized in memory
+try:
+    import ijson
+    _JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:
+    ijson = None
+    _JSON_ERRORS = (json.JSONDecodeError,)
+
+# Constants
+DEFAULT_SPLIT_PENALTY = 7
+CACHE_ROOT = Path.home() / ".cache" / "alass4Container"
+OPTIONS_FILE = Path.home() / ".alass4container.json"
+SUBTITLE_EXTENSIONS = {
+    "ass": "ass",
+    "ssa": "ass",
+    "srt": "srt",
+    "vobsub": "idx"
+}
+# Precompiled codec matcher covering the keys of SUBTITLE_EXTENSIONS
+_CODEC_EXT_RE = re.compile(r"(ass|ssa|srt|vobsub)")
+# Matches the "Progress: NN%" lines mkvextract/mkvmerge print to stdout
+_PROGRESS_RE = re.compile(r"Progress:\s*(\d+)%")
+# Codec tokens alass can actually process. Image-based subtitles (PGS,
+# VobSub) can't be synchronized, so extracting them is wasted I/O.
+ALASS_COMPATIBLE_CODECS = ("srt", "subrip", "ass", "ssa", "substation", "utf8", "text")
+
+# Boolean track properties forwarded to mkvmerge when remuxing, as
+# (property, flag, argument, default) rows. The flag is emitted whenever
+# the property differs from its default — enabled_track defaults to True,
+# so it is only passed when a track was explicitly disabled.
+_MUX_FLAG_TABLE = (
+    ("forced_track", "--forced-track", "0:yes", False),
+    ("enabled_track", "--track-enabled", "0:no", True),
+    ("hearing_impaired", "--hearing-impaired-flag", "0:yes", False),
+    ("visual_impaired", "--visual-impaired-flag", "0:yes", False),
+    ("text_descriptions", "--text-descriptions-flag", "0:yes", False),
+    ("original_language", "--original-flag", "0:yes", False),
+    ("commentary", "--commentary-flag", "0:yes", False),
+)
+
+# Common Windows install locations, expanded once at import time so
+# find_tool doesn't re-scan the environment table on every call
+if sys.platform == 'win32':
+    _WIN_COMMON_DIRS = (
+        os.path.expandvars("%ProgramFiles%\\MKVToolNix"),
+        os.path.expandvars("%ProgramFiles(x86)%\\MKVToolNix"),
+        os.path.expandvars("%LOCALAPPDATA%\\Programs\\MKVToolNix"),
+        os.path.expandvars("%APPDATA%\\MKVToolNix"),
+        os.path.expandvars("%USERPROFILE%\\AppData\\Local\\MKVToolNix"),
+        os.path.expandvars("%USERPROFILE%\\AppData\\Roaming\\MKVToolNix"),
+        os.path.join(os.getcwd(), "bin"),  # Check in a bin directory in current working directory
+        os.getcwd()  # Check in current directory
+    )
+    _WIN_ALASS_DIRS = (
+        os.path.expandvars("%USERPROFILE%\\Downloads\\alass"),
+        os.path.expandvars("%USERPROFILE%\\Documents\\alass"),
+        os.path.expandvars("%USERPROFILE%\\Desktop\\alass"),
+        os.path.expandvars("%LOCALAPPDATA%\\Programs\\alass"),
+        os.path.expandvars("%APPDATA%\\alass"),
+    )
+else:
+    _WIN_COMMON_DIRS = ()
+    _WIN_ALASS_DIRS = ()
+
+def _ramdisk() -> Optional[str]:
+    """
+    Return a memory-backed temp directory, or None to use the default.
+
+    Subtitles are written by mkvextract and immediately re-read by alass;
+    putting the uncached working directory on tmpfs keeps that round trip
+    off the disk. Skipped when the mount is too small to be safe.
+    """
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        try:
+            if shutil.disk_usage("/dev/shm").free > 100 * 1024 * 1024:
+                return "/dev/shm"
+        except OSError:
+            pass
+    return None
+
+def _nonempty(path: str) -> bool:
+    """Check that a file exists and is not empty with a single stat call."""
+    try:
+        return os.stat(path).st_size > 0
+    except OSError:
+        return False
+
+def _part_path(path: str) -> str:
+    """
+    Scratch name a producer writes to before the file enters the cache.
+
+    mkvextract and alass write straight to their target paths, so a crash
+    or Ctrl+C mid-run would leave truncated-but-nonempty files that later
+    runs would mistake for cached results. Producers write to this name
+    instead and the result is renamed into place only after they exit
+    cleanly, mirroring the os.replace pattern of the ident cache. The
+    extension is preserved because alass derives its output format from it.
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.part{ext}"
+
+@dataclass
+class ToolPaths:
+    """Class to store paths to external tools."""
+    mkvmerge: Optional[str] = None
+    mkvextract: Optional[str] = None
+    alass: Optional[str] = None
+    
+    def all_found(self) -> bool:
+        """Check if all required tools were found."""
+        return all([self.mkvmerge, self.mkvextract, self.alass])
+
+@dataclass(slots=True)
+class SubtitleTrack:
+    """Class to store subtitle track information."""
+    track_id: int
+    language: str
+    track_name: str
+    codec: str
+    properties: Dict[str, Any] = field(default_factory=dict)
+    file_path: Optional[str] = None
+    corrected_path: Optional[str] = None
+    # File extension derived from the codec, filled in by __post_init__
+    extension: str = field(init=False)
+
+    def __post_init__(self):
+        """Determine the appropriate file extension based on codec."""
+        match = _CODEC_EXT_RE.search(self.codec)
+        self.extension = SUBTITLE_EXTENSIONS[match.group(1)] if match else "srt"
+
+@dataclass
+class SyncOptions:
+    """Class to store synchronization options."""
+    split_penalty: Optional[float] = None
+    no_splits: bool = False
+    subs_only: bool = False
+
+    @property
+    def cache_tag(self) -> str:
+        """Short filename-safe token identifying these options.
+
+        Cached corrected files are keyed by it, so tuning runs with a
+        different split penalty never reuse output produced with another
+        one, while repeating the same settings stays instantaneous.
+        """
+        if self.no_splits:
+            return "nosplits"
+        if self.split_penalty is not None:
+            return f"p{self.split_penalty:g}"
+        return "default"
+
+class AlassContainer:
+    """Main class for the alass4Container application."""
+    
+    def __init__(self):
+        """Initialize the application."""
+        self.console = Console()
+        self.tools = ToolPaths()
+        self.subtitle_tracks: List[SubtitleTrack] = []
+        self.options = SyncOptions()
+        # First audio track ID, noted while analyzing the MKV; used as the
+        # alass reference so the container isn't demuxed once per track
+        self._audio_track_id: Optional[str] = None
+
+        # Batch workers run unattended: never prompt, overwrite outputs
+        self.batch_mode = False
+        # Options given on the command line skip the options dialog
+        self.options_from_cli = False
+        # Directory for staging the remux output (--work-dir), so the
+        # heavy write can land on a different device than the source
+        self.work_dir: Optional[str] = None
+
+        # Root window for tkinter dialogs, created lazily on first use:
+        # Tk() init costs hundreds of ms and fails outright on headless
+        # systems, where we fall back to console prompts instead
+        self._root: Optional[tk.Tk] = None
+        self._tk_failed = False
+
+    @property
+    def root(self) -> Optional[tk.Tk]:
+        """
+        The hidden Tk root for dialogs, created on first access.
+
+        Returns:
+            The Tk root, or None when no display is available
+        """
+        if self._root is None and not self._tk_failed:
+            try:
+                import tkinter as tk
+                self._root = tk.Tk()
+                self._root.withdraw()  # Hide the main window
+            except Exception:  # tk.TclError, or tkinter missing entirely
+                self._tk_failed = True
+        return self._root
+
+    def _show_error(self, title: str, message: str):
+        """Show an error dialog, or nothing extra when headless (the
+        console error has already been printed by the caller)."""
+        if self.root is not None:
+            from tkinter import messagebox
+            messagebox.showerror(title, message, parent=self.root)
+
+    def _show_info(self, title: str, message: str):
+        """Show an info dialog when a display is available."""
+        if self.root is not None:
+            from tkinter import messagebox
+            messagebox.showinfo(title, message, parent=self.root)
+
+    def _show_warning(self, title: str, message: str):
+        """Show a warning dialog when a display is available."""
+        if self.root is not None:
+            from tkinter import messagebox
+            messagebox.showwarning(title, message, parent=self.root)
+
+    def _ask_yes_no(self, title: str, message: str) -> bool:
+        """Ask a yes/no question via dialog, or console prompt when headless."""
+        if self.root is not None:
+            from tkinter import messagebox
+            return messagebox.askyesno(title, message, parent=self.root)
+        return Confirm.ask(message.replace("\n", " "), console=self.console, default=False)
+
+    def _ask_float(self, title: str, message: str, minvalue: float, maxvalue: float,
+                   initialvalue: float) -> Optional[float]:
+        """Ask for a number via dialog, or console prompt when headless."""
+        if self.root is not None:
+            from tkinter import simpledialog
+            return simpledialog.askfloat(
+                title, message,
+                parent=self.root,
+                minvalue=minvalue,
+                maxvalue=maxvalue,
+                initialvalue=initialvalue
+            )
+        value = FloatPrompt.ask(message.replace("\n", " "), console=self.console,
+                                default=float(initialvalue))
+        return value if minvalue <= value <= maxvalue else initialvalue
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def find_tool(tool_name: str) -> Optional[str]:
+        """
+        Find a tool in PATH or common locations.
+
+        Results are memoized: check_tools probes the same names repeatedly,
+        and each lookup stats every PATH entry plus (on Windows) a dozen
+        common installation directories.
+
+        Args:
+            tool_name: Name of the tool to find
+
+        Returns:
+            Path to the tool if found, None otherwise
+        """
+        # Try with and without .exe extension for Windows compatibility
+        possible_names = [tool_name]
+        if sys.platform == 'win32':
+            possible_names.append(f"{tool_name}.exe")
+            possible_names.append(f"{tool_name}-cli.exe")  # For alass on Windows
+
+        # First try to find it in PATH
+        for name in possible_names:
+            path = shutil.which(name)
+            if path:
+                return path
+
+        # If on Windows, look in common installation directories
+        if sys.platform == 'win32':
+            # Base directories to check, plus alass-specific ones when
+            # searching for alass
+            common_dirs = _WIN_COMMON_DIRS
+            if tool_name == "alass":
+                common_dirs = common_dirs + _WIN_ALASS_DIRS
+
+            for directory in common_dirs:
+                # One scandir pass per directory instead of a stat per
+                # candidate name; DirEntry.is_file() reuses the cached stat
+                try:
+                    entries = {e.name.lower(): e.path for e in os.scandir(directory) if e.is_file()}
+                except OSError:
+                    continue
+                for name in possible_names:
+                    path = entries.get(name.lower())
+                    if path:
+                        return path
+        # I hate this so much
+        # TODO: On non-Windows platforms, could add common install locations here
+
+        return None
+
+    @functools.cached_property
+    def _version_cache(self) -> Dict[str, str]:
+        """Load the persisted tool-version cache, or an empty dict."""
+        if os.environ.get("ALASS4C_NO_CACHE"):
+            return {}
+        try:
+            with open(CACHE_ROOT / "versions.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_version_cache(self) -> None:
+        """Persist the tool-version cache; failures are non-fatal."""
+        if os.environ.get("ALASS4C_NO_CACHE"):
+            return
+        try:
+            CACHE_ROOT.mkdir(parents=True, exist_ok=True)
+            with open(CACHE_ROOT / "versions.json", "w", encoding="utf-8") as f:
+                json.dump(self._version_cache, f)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _load_tool_cache() -> Dict[str, str]:
+        """
+        Load tool paths cached by a previous run, if still valid.
+
+        The cache is keyed by a hash of PATH, so installing or moving the
+        tools (which changes PATH or invalidates the stored paths)
+        transparently falls back to a fresh scan.
+
+        Returns:
+            Mapping of tool name to path, or an empty dict on any miss
+        """
+        if os.environ.get("ALASS4C_NO_CACHE"):
+            return {}
+        try:
+            with open(CACHE_ROOT / "tools.json", "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        path_hash = hashlib.sha1(os.environ.get("PATH", "").encode()).hexdigest()
+        if data.get("path_hash") != path_hash:
+            return {}
+        tools = data.get("tools", {})
+        if all(os.path.isfile(p) for p in tools.values()):
+            return tools
+        return {}
+
+    @staticmethod
+    def _save_tool_cache(tools: Dict[str, str]) -> None:
+        """Persist resolved tool paths for the next startup; best effort."""
+        if os.environ.get("ALASS4C_NO_CACHE"):
+            return
+        try:
+            CACHE_ROOT.mkdir(parents=True, exist_ok=True)
+            with open(CACHE_ROOT / "tools.json", "w", encoding="utf-8") as f:
+                json.dump({
+                    "path_hash": hashlib.sha1(
+                        os.environ.get("PATH", "").encode()).hexdigest(),
+                    "tools": tools
+                }, f)
+        except OSError:
+            pass
+
+    def _tool_version(self, tool_path: str, probe_help: bool = False) -> str:
+        """
+        Return a tool's version banner, cached across runs.
+
+        A tool's version only changes when its binary does, so results are
+        persisted in versions.json keyed by the binary's real path and
+        mtime. A cache hit avoids spawning the tool at all.
+
+        Args:
+            tool_path: Path to the tool binary
+            probe_help: Tolerate tools without a --version flag (alass
+                builds don't all accept it)
+
+        Returns:
+            The first line of the tool's version output
+        """
+        key = f"{os.path.realpath(tool_path)}|{int(os.path.getmtime(tool_path))}"
+        if key in self._version_cache:
+            return self._version_cache[key]
+
+        # Keep subprocess output as bytes and decode just the line we keep;
+        # text=True would run the whole output through an incremental UTF-8
+        # decoder, and tool banners aren't guaranteed to be valid UTF-8
+        if probe_help:
+            # Try --version directly and inspect the exit code rather than
+            # rendering the full --help text first just to look for the flag
+            probe = subprocess.run([tool_path, "--version"], capture_output=True,
+                                   timeout=5)
+            if probe.returncode == 0:
+                version = probe.stdout.decode("utf-8", errors="replace").strip()
+            else:
+                version = "Unknown version"
+        else:
+            out = subprocess.run(
+                [tool_path, "--version"],
+                capture_output=True, check=True, timeout=5
+            ).stdout
+            version = out.split(b'\n', 1)[0].decode("utf-8", errors="replace").strip()
+
+        self._version_cache[key] = version
+        return version
+
+    def check_tools(self) -> bool:
+        """
+        Check if all required tools are available.
+        
+        Returns:
+            True if all tools are found, False otherwise
+        """
+        missing_tools = []
+
+        with self.console.status("[cyan]Checking for required tools...[/cyan]", spinner="dots"):
+            # Reuse tool paths resolved by a previous startup when PATH is
+            # unchanged and the binaries are still in place, skipping the
+            # per-directory probing entirely
+            cached = self._load_tool_cache()
+
+            # Check for mkvmerge
+            self.tools.mkvmerge = cached.get("mkvmerge") or self.find_tool("mkvmerge")
+            if not self.tools.mkvmerge:
+                missing_tools.append("mkvmerge")
+
+            # Check for mkvextract
+            self.tools.mkvextract = cached.get("mkvextract") or self.find_tool("mkvextract")
+            if not self.tools.mkvextract:
+                missing_tools.append("mkvextract")
+
+            # Check for alass
+            self.tools.alass = cached.get("alass") or self.find_tool("alass")
+            if not self.tools.alass:
+                # Try alass-cli as an alternative
+                self.tools.alass = self.find_tool("alass-cli")
+                if not self.tools.alass:
+                    missing_tools.append("alass")
+
+            if not missing_tools:
+                self._save_tool_cache({
+                    "mkvmerge": self.tools.mkvmerge,
+                    "mkvextract": self.tools.mkvextract,
+                    "alass": self.tools.alass
+                })
+
+        if missing_tools:
+            missing_str = ", ".join(missing_tools)
+            self.console.print(f"[bold red]Error: Required tools are missing: {missing_str}[/bold red]")
+            self.console.print("[yellow]Paths searched: PATH environment variable and common installation directories.[/yellow]")
+            self.console.print("[yellow]Please make sure mkvtoolnix (mkvmerge, mkvextract) and alass are installed and in your PATH.[/yellow]")
+            
+            self._show_error(
+                "Missing Tools",
+                f"The following tools are required but could not be found: {missing_str}\n\n"
+                "Please make sure MKVToolNix and alass are installed and in your PATH."
+            )
+            
+            return False
+        
+        # Verify the tools work by checking their version/help output.
+        # The probes are independent subprocesses, so run them in parallel
+        # instead of paying three process spawns back to back.
+        try:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                mkvmerge_future = executor.submit(self._tool_version, self.tools.mkvmerge)
+                mkvextract_future = executor.submit(self._tool_version, self.tools.mkvextract)
+                alass_future = executor.submit(self._tool_version, self.tools.alass, True)
+
+                mkvmerge_version = mkvmerge_future.result()
+                mkvextract_version = mkvextract_future.result()
+                alass_version = alass_future.result()
+
+            self._save_version_cache()
+
+            # Display found tools
+            self.console.print("[bold green]Required tools found:[/bold green]")
+            self.console.print(f"  [cyan]•[/cyan] MKVMerge: [green]{mkvmerge_version}[/green]")
+            self.console.print(f"  [cyan]•[/cyan] MKVExtract: [green]{mkvextract_version}[/green]")
+            self.console.print(f"  [cyan]•[/cyan] Alass: [green]{alass_version}[/green]")
+            
+            return True
+        except subprocess.SubprocessError as e:
+            self.console.print(f"[bold red]Error running tools: {e}[/bold red]")
+            self._show_error(
+                "Tool Verification Failed",
+                f"Found the tools, but encountered an error when trying to run them: {e}"
+            )
+            return False
+    
+    def select_mkv_file(self) -> str:
+        """
+        Show a file dialog to select an MKV file, or a console prompt when
+        no display is available.
+
+        Returns:
+            Path to the selected file
+        """
+        if self.root is not None:
+            from tkinter import filedialog
+            file_path = filedialog.askopenfilename(
+                title="Select MKV file",
+                filetypes=[("MKV files", "*.mkv")]
+            )
+        else:
+            # Unlike the file dialog, the console prompt can't guarantee
+            # the path exists, so re-prompt on typos
+            while True:
+                file_path = self.console.input("Path to MKV file: ").strip()
+                if not file_path or os.path.isfile(file_path):
+                    break
+                self.console.print(f"[red]File not found: {file_path}[/red]")
+        if not file_path:
+            self.console.print("[yellow]No file selected. Exiting.[/yellow]")
+            sys.exit(0)
+        return file_path
+    
+    def _identify_tracks(self, mkv_file: str) -> List[Dict[str, Any]]:
+        """
+        Return the raw mkvmerge track list for a file, cached on disk.
+
+        The cache is keyed by the file's path, mtime and size, so any change
+        to the source invalidates it; repeat runs on the same MKV skip the
+        mkvmerge -J subprocess entirely. Set ALASS4C_NO_CACHE to disable.
+
+        Args:
+            mkv_file: Path to the MKV file
+
+        Returns:
+            List of raw track dicts as emitted by mkvmerge -J
+        """
+        cache_file = None
+        if not os.environ.get("ALASS4C_NO_CACHE"):
+            st = os.stat(mkv_file)
+            key = hashlib.sha1(
+                f"{os.path.abspath(mkv_file)}|{st.st_mtime_ns}|{st.st_size}".encode()
+            ).hexdigest()
+            cache_file = CACHE_ROOT / "ident" / f"{key}.json"
+            try:
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+
+        cmd = [self.tools.mkvmerge, "-J", mkv_file]
+        if ijson is not None:
+            # Stream just the tracks array off the pipe; attachments
+            # and chapters are skipped without ever being built. stderr
+            # is discarded — nobody reads it, and an unread pipe could
+            # fill up and deadlock mkvmerge against the stdout parse
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            raw_tracks = list(ijson.items(proc.stdout, 'tracks.item'))
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, cmd)
+        else:
+            # Keep stdout as bytes: orjson wants bytes, and this skips the
+            # UTF-8 decode pass text=True would do on a potentially large dump
+            result = subprocess.run(cmd, capture_output=True, check=True)
+            raw_tracks = _json_loads(result.stdout).get('tracks', [])
+
+        if cache_file is not None:
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = f"{cache_file}.tmp"
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(raw_tracks, f, default=str)
+                os.replace(tmp_file, cache_file)
+            except OSError:
+                pass
+
+        return raw_tracks
+
+    def get_subtitle_tracks(self, mkv_file: str) -> List[SubtitleTrack]:
+        """
+        Extract subtitle track information from an MKV file.
+        
+        Args:
+            mkv_file: Path to the MKV file
+            
+        Returns:
+            List of SubtitleTrack objects
+            
+        Raises:
+            SystemExit: If there's an error analyzing the MKV file
+        """
+        try:
+            raw_tracks = self._identify_tracks(mkv_file)
+
+            tracks = []
+            # Local alias avoids method lookup on every append in the loop
+            tracks_append = tracks.append
+
+            # Extract subtitle tracks
+            for track in raw_tracks:
+                # Remember the first audio track for use as the alass reference
+                if track.get('type') == 'audio' and self._audio_track_id is None:
+                    audio_id = track.get('id')
+                    if audio_id is not None:
+                        self._audio_track_id = str(audio_id)
+                if track.get('type') == 'subtitles':
+                    track_id = track.get('id')
+                    properties = track.get('properties', {})
+                    
+                    # Get full language code including region if available
+                    language = properties.get('language', 'und')  # Default to 'und' (undefined) if no language
+                    
+                    # Check for language-specific tags that might contain region info
+                    if 'language_ietf' in properties:
+                        # IETF language tags (like pt-BR, es-419, zh-Hant) take precedence
+                        language = properties.get('language_ietf')
+                    
+                    track_name = properties.get('track_name', '')
+                    codec = track.get('codec', '').lower()
+
+                    # Skip codecs alass can't process (image-based subtitles
+                    # like PGS/VobSub) so they never cost an extraction pass
+                    if not any(token in codec for token in ALASS_COMPATIBLE_CODECS):
+                        self.console.print(
+                            f"  [yellow]•[/yellow] Skipping track {track.get('id')} "
+                            f"([italic]{codec}[/italic]): unsupported by alass"
+                        )
+                        continue
+
+                    # Extract track properties for later use
+                    track_props = {
+                        'default_track': properties.get('default_track', False),
+                        'forced_track': properties.get('forced_track', False),
+                        'enabled_track': properties.get('enabled_track', True),
+                        'hearing_impaired': properties.get('hearing_impaired_flag', False),
+                        'visual_impaired': properties.get('visual_impaired_flag', False),
+                        'text_descriptions': properties.get('text_descriptions_flag', False),
+                        'original_language': properties.get('original_language', False),
+                        'commentary': properties.get('commentary_flag', False)
+                    }
+                    
+                    if track_id is not None:
+                        tracks_append(SubtitleTrack(
+                            track_id=int(track_id),
+                            language=language,
+                            track_name=track_name,
+                            codec=codec,
+                            properties=track_props
+                        ))
+            
+            # Sort once by numeric track ID; downstream stages preserve this
+            # order, so the final mux doesn't need to re-sort
+            tracks.sort(key=attrgetter('track_id'))
+            return tracks
+        except subprocess.SubprocessError as e:
+            self.console.print(f"[bold red]Error running mkvmerge: {e}[/bold red]")
+            self._show_error("Error", f"Failed to analyze MKV file: {e}")
+            sys.exit(1)
+        except _JSON_ERRORS as e:
+            self.console.print(f"[bold red]Error parsing mkvmerge output: {e}[/bold red]")
+            self._show_error("Error", f"Failed to parse MKV information: {e}")
+            sys.exit(1)
+    
+    @staticmethod
+    def _load_last_options() -> Optional[SyncOptions]:
+        """Load the options saved by the previous run, if any."""
+        try:
+            with open(OPTIONS_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return SyncOptions(
+                split_penalty=data.get("split_penalty"),
+                no_splits=bool(data.get("no_splits", False)),
+                subs_only=bool(data.get("subs_only", False))
+            )
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _save_last_options(options: SyncOptions):
+        """Persist the chosen options as next run's defaults; best effort."""
+        try:
+            with open(OPTIONS_FILE, "w", encoding="utf-8") as f:
+                json.dump({
+                    "split_penalty": options.split_penalty,
+                    "no_splits": options.no_splits,
+                    "subs_only": options.subs_only
+                }, f)
+        except OSError:
+            pass
+
+    def _options_dialog(self, last: Optional[SyncOptions] = None) -> SyncOptions:
+        """
+        Show one consolidated dialog for all synchronization options.
+
+        A single Toplevel with a radio group replaces the old cascade of
+        modal dialogs, so the user answers everything in one round-trip.
+
+        Args:
+            last: Options from the previous run, used as initial values
+
+        Returns:
+            SyncOptions object with user preferences
+        """
+        options = SyncOptions()
+
+        import tkinter as tk
+        from tkinter import ttk
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Synchronization Options")
+        dialog.resizable(False, False)
+
+        # Pre-select whatever the user picked last time
+        initial_choice = "default"
+        initial_penalty = DEFAULT_SPLIT_PENALTY
+        if last is not None:
+            if last.no_splits:
+                initial_choice = "no_splits"
+            elif last.split_penalty is not None:
+                initial_choice = "custom"
+                initial_penalty = last.split_penalty
+
+        choice = tk.StringVar(master=dialog, value=initial_choice)
+        penalty = tk.StringVar(master=dialog, value=str(initial_penalty))
+        subs_only = tk.BooleanVar(master=dialog,
+                                  value=last.subs_only if last is not None else False)
+
+        frame = ttk.Frame(dialog, padding=12)
+        frame.grid(sticky="nsew")
+
+        ttk.Label(frame, text="How should alass align the subtitles?").grid(
+            row=0, column=0, columnspan=2, sticky="w", pady=(0, 8))
+        ttk.Radiobutton(frame, text=f"Default split penalty ({DEFAULT_SPLIT_PENALTY})",
+                        variable=choice, value="default").grid(
+            row=1, column=0, columnspan=2, sticky="w")
+        ttk.Radiobutton(frame, text="No splits (only constant time shifts)",
+                        variable=choice, value="no_splits").grid(
+            row=2, column=0, columnspan=2, sticky="w")
+        ttk.Radiobutton(frame, text="Custom split penalty (0-1000, higher avoids splits):",
+                        variable=choice, value="custom").grid(
+            row=3, column=0, sticky="w")
+        ttk.Entry(frame, textvariable=penalty, width=8).grid(
+            row=3, column=1, sticky="w", padx=(6, 0))
+        ttk.Checkbutton(frame, text="Only export corrected subtitle files (skip remuxing)",
+                        variable=subs_only).grid(
+            row=4, column=0, columnspan=2, sticky="w", pady=(8, 0))
+
+        def on_ok():
+            selected = choice.get()
+            if selected == "no_splits":
+                options.no_splits = True
+            elif selected == "custom":
+                try:
+                    value = float(penalty.get())
+                except ValueError:
+                    value = None
+                if value is not None and 0 <= value <= 1000:
+                    options.split_penalty = value
+            options.subs_only = subs_only.get()
+            dialog.destroy()
+
+        ttk.Button(frame, text="OK", command=on_ok).grid(
+            row=5, column=0, columnspan=2, pady=(12, 0))
+
+        # Closing the window keeps the defaults, same as pressing OK
+        dialog.protocol("WM_DELETE_WINDOW", on_ok)
+        dialog.transient(self.root)
+        dialog.grab_set()
+        self.root.wait_window(dialog)
+
+        return options
+
+    def get_options(self) -> SyncOptions:
+        """
+        Get synchronization options from the user.
+
+        The previous run's choices are loaded as defaults and the new
+        choices are saved back, so repeat runs need no re-configuration.
+
+        Returns:
+            SyncOptions object with user preferences
+        """
+        last = self._load_last_options()
+
+        if self.root is not None:
+            options = self._options_dialog(last)
+            self._save_last_options(options)
+            return options
+
+        # Console fallback for headless systems
+        options = SyncOptions()
+
+        # Ask if the user wants to disable splits entirely first
+        no_splits = self._ask_yes_no(
+            "No Splits Mode",
+            "Do you want to disable splits entirely?\nOnly constant time shifts will be applied."
+        )
+
+        if no_splits:
+            options.no_splits = True
+        else:
+            # Only ask about split penalty if we're not disabling splits entirely
+            adjust_split = self._ask_yes_no(
+                "Split Penalty",
+                "Do you want to adjust the split penalty?\nDefault is 7, higher values avoid splits."
+            )
+
+            if adjust_split:
+                split_penalty = self._ask_float(
+                    "Split Penalty Value",
+                    f"Enter a value between 0 and 1000 (default is {DEFAULT_SPLIT_PENALTY}):\nHigher values make splits less likely.",
+                    minvalue=0,
+                    maxvalue=1000,
+                    initialvalue=DEFAULT_SPLIT_PENALTY
+                )
+
+                if split_penalty is not None:
+                    options.split_penalty = split_penalty
+
+        options.subs_only = self._ask_yes_no(
+            "Subtitles Only",
+            "Only export the corrected subtitle files and skip remuxing the MKV?"
+        )
+
+        self._save_last_options(options)
+        return options
+    
+    def extract_subtitles(self, mkv_file: str, subtitle_tracks: List[SubtitleTrack],
+                         temp_dir: str) -> List[SubtitleTrack]:
+        """
+        Extract subtitle files from an MKV file.
+
+        All tracks are extracted in a single mkvextract invocation: mkvextract
+        accepts multiple ID:path pairs and demuxes the source file exactly
+        once, instead of re-reading the whole MKV per track.
+
+        Args:
+            mkv_file: Path to the MKV file
+            subtitle_tracks: List of SubtitleTrack objects
+            temp_dir: Temporary directory to store extracted files
+
+        Returns:
+            List of SubtitleTrack objects with file_path set
+        """
+        extracted_tracks = []
+
+        # Unsupported codecs (PGS etc.) are already filtered out in
+        # get_subtitle_tracks, so every track here is real work
+        work = list(subtitle_tracks)
+
+        self.console.print("\n[bold]Extracting subtitles...[/bold]")
+
+        # Map each track to its extraction target, reusing files already
+        # present in a persistent cache directory from a previous run
+        output_files = {}
+        for track in list(work):
+            output_file = os.path.join(temp_dir, f"{track.track_id}.{track.language}.{track.extension}")
+            if _nonempty(output_file):
+                track.file_path = output_file
+                extracted_tracks.append(track)
+                work.remove(track)
+                self.console.print(f"  [green]•[/green] Reusing cached extraction for track {track.track_id} ({track.language})")
+            else:
+                output_files[track.track_id] = output_file
+
+        if not work:
+            return extracted_tracks
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[bold blue]{task.description}[/bold blue]"),
+            BarColumn(bar_width=None),
+            TextColumn("[cyan]{task.completed}/{task.total}[/cyan]"),
+            TimeRemainingColumn(),
+            console=self.console,
+            refresh_per_second=4  # cap repaints; slow terminals choke on more
+        ) as progress:
+            task = progress.add_task("[cyan]Extracting...[/cyan]", total=len(work))
+
+            try:
+                # One mkvextract call extracts every track in a single pass;
+                # its progress output drives the bar as the file is demuxed.
+                # Extraction lands on scratch names and is renamed into the
+                # cache below, so an interrupted run leaves nothing reusable
+                cmd = [self.tools.mkvextract, "tracks", mkv_file]
+                cmd.extend(f"{track_id}:{_part_path(path)}"
+                           for track_id, path in output_files.items())
+                self._run_with_progress(cmd, progress, task, len(work))
+            except subprocess.SubprocessError as e:
+                progress.update(task, description=f"[bold red]Error running mkvextract: {e}[/bold red]")
+                return extracted_tracks
+
+            # Check which output files actually materialized and move them
+            # into their final (cacheable) names
+            for track in work:
+                output_file = output_files[track.track_id]
+                part_file = _part_path(output_file)
+                if _nonempty(part_file):
+                    os.replace(part_file, output_file)
+                if _nonempty(output_file):
+                    track.file_path = output_file
+                    extracted_tracks.append(track)
+                    description = f"[cyan]Extracted track {track.track_id} ({track.language})[/cyan]"
+                else:
+                    description = f"[red]Failed to extract track {track.track_id}[/red]"
+                progress.update(task, description=description)
+
+        # Return in input (track ID) order regardless of cache hits
+        return [t for t in subtitle_tracks if t.file_path is not None]
+
+    @staticmethod
+    def _run_with_progress(cmd: List[str], progress: Progress, task, scale: int) -> None:
+        """
+        Run a command, driving a progress task from its 'Progress: N%' lines.
+
+        mkvextract prints its percentage to stdout; parsing it live keeps
+        the bar moving smoothly through one long invocation instead of
+        jumping when it exits, without buffering the full output in memory.
+
+        Args:
+            cmd: Command argv to run
+            progress: Progress display that owns the task
+            task: ID of the task to update
+            scale: The task's total; completed is set to pct/100 * scale
+
+        Raises:
+            subprocess.CalledProcessError: If the command exits nonzero; the
+                last few non-progress output lines are attached as output
+        """
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True,
+                                errors="replace", bufsize=1)
+        tail: List[str] = []
+        last_pct = -5
+        with proc.stdout:
+            for line in proc.stdout:
+                match = _PROGRESS_RE.search(line)
+                if match:
+                    pct = int(match.group(1))
+                    # Coalesce: push an update every 5 points (and at 100%)
+                    # instead of re-rendering for each percent line. Round
+                    # so the completed/total column renders whole numbers
+                    if pct - last_pct >= 5 or pct == 100:
+                        progress.update(task, completed=round(pct / 100 * scale))
+                        last_pct = pct
+                elif line.strip():
+                    # Keep a short tail of real output for error reporting
+                    tail = (tail + [line])[-10:]
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, output="".join(tail))
+
+    def _extract_reference(self, mkv_file: str, temp_dir: str) -> str:
+        """
+        Extract the first audio track once for use as the alass reference.
+
+        alass re-opens and demuxes its reference file for every track it
+        synchronizes; handing it a pre-extracted audio stream pays the MKV
+        demux cost once instead of once per subtitle track.
+
+        Args:
+            mkv_file: Path to the MKV file
+            temp_dir: Directory to store the extracted audio stream
+
+        Returns:
+            Path to the extracted audio stream, or the MKV itself when no
+            audio track is available or extraction fails
+        """
+        if self._audio_track_id is None:
+            return mkv_file
+
+        reference = os.path.join(temp_dir, f"reference.{self._audio_track_id}.audio")
+
+        # Reuse a reference cached by a previous run
+        if _nonempty(reference):
+            return reference
+
+        # Extract to a scratch name and rename into the cache only on a
+        # clean exit, so an interrupted run can't leave a truncated file
+        part_file = _part_path(reference)
+        try:
+            cmd = [self.tools.mkvextract, "tracks", mkv_file, f"{self._audio_track_id}:{part_file}"]
+            subprocess.run(cmd, check=True, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL)
+        except subprocess.SubprocessError:
+            return mkv_file
+
+        if _nonempty(part_file):
+            os.replace(part_file, reference)
+            return reference
+        return mkv_file
+
+    @staticmethod
+    def _corrected_file_for(track: SubtitleTrack, temp_dir: str,
+                            options: SyncOptions) -> str:
+        """Cache path of a track's corrected subtitle for the given options."""
+        return os.path.join(
+            temp_dir,
+            f"{track.track_id}.{track.language}.{options.cache_tag}.corrected.{track.extension}"
+        )
+
+    def _sync_one(self, mkv_file: str, track: SubtitleTrack, temp_dir: str,
+                  options: SyncOptions, reference: Optional[str] = None) -> Optional[SubtitleTrack]:
+        """
+        Synchronize a single subtitle track with alass.
+
+        Args:
+            mkv_file: Path to the MKV file
+            track: SubtitleTrack object with file_path set
+            temp_dir: Temporary directory to store the corrected file
+            options: SyncOptions object with synchronization preferences
+            reference: Reference file for alass; defaults to the MKV itself
+
+        Returns:
+            The track with corrected_path set on success, None on failure
+        """
+        # Define output file path for corrected subtitle. The options tag
+        # keys the cache, so runs with different settings don't collide.
+        corrected_file = self._corrected_file_for(track, temp_dir, options)
+
+        # Reuse a corrected file cached by a previous run with the same
+        # options on the same MKV
+        if _nonempty(corrected_file):
+            track.corrected_path = corrected_file
+            return track
+
+        # Try the (cheaper) extracted audio reference first, then fall back
+        # to the full MKV if alass can't handle the raw stream
+        references = [reference or mkv_file]
+        if references[0] != mkv_file:
+            references.append(mkv_file)
+
+        # alass writes to a scratch name; the result is renamed into the
+        # cache only after a clean exit, so an interrupted run can't leave
+        # a truncated file that later runs would reuse
+        part_file = _part_path(corrected_file)
+
+        for ref in references:
+            # Build the alass command
+            cmd = [self.tools.alass]
+
+            # Add options if specified
+            if options.split_penalty is not None:
+                cmd.extend(["--split-penalty", str(options.split_penalty)])
+            if options.no_splits:
+                cmd.append("--no-splits")
+
+            # Add the reference, input file, and output file
+            cmd.extend([ref, track.file_path, part_file])
+
+            try:
+                subprocess.run(cmd, check=True, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL)
+            except subprocess.SubprocessError:
+                if ref == mkv_file:
+                    raise
+                continue
+
+            # Check if the corrected file was created
+            if _nonempty(part_file):
+                os.replace(part_file, corrected_file)
+                track.corrected_path = corrected_file
+                return track
+
+        return None
+
+    def synchronize_subtitles(self, mkv_file: str, subtitle_tracks: List[SubtitleTrack],
+                             temp_dir: str, options: SyncOptions) -> List[SubtitleTrack]:
+        """
+        Synchronize subtitle files with the video using alass.
+
+        Each track is an independent alass process, so tracks are synchronized
+        concurrently. alass is CPU-heavy, so the pool is capped at half the
+        available cores to avoid oversubscription.
+
+        Args:
+            mkv_file: Path to the MKV file
+            subtitle_tracks: List of SubtitleTrack objects with file_path set
+            temp_dir: Temporary directory to store corrected files
+            options: SyncOptions object with synchronization preferences
+
+        Returns:
+            List of SubtitleTrack objects with corrected_path set
+        """
+        self.console.print("\n[bold]Synchronizing subtitles...[/bold]")
+
+        # Demux the audio reference once instead of once per alass run,
+        # but not at all when every track is already a cache hit
+        reference = mkv_file
+        if any(not _nonempty(self._corrected_file_for(t, temp_dir, options))
+               for t in subtitle_tracks):
+            with self.console.status("[cyan]Preparing audio reference...[/cyan]", spinner="dots"):
+                reference = self._extract_reference(mkv_file, temp_dir)
+
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[bold blue]{task.description}[/bold blue]"),
+                BarColumn(bar_width=None),
+                TextColumn("[cyan]{task.completed}/{task.total}[/cyan]"),
+                TimeRemainingColumn(),
+                console=self.console,
+                refresh_per_second=4  # cap repaints; slow terminals choke on more
+            ) as progress:
+                task = progress.add_task("[cyan]Synchronizing...[/cyan]", total=len(subtitle_tracks))
+
+                # Worker cap: ALASS_JOBS overrides the default of half the CPUs
+                # (alass is itself multithreaded, so full fan-out oversubscribes)
+                try:
+                    jobs = int(os.environ["ALASS_JOBS"])
+                except (KeyError, ValueError):
+                    jobs = (os.cpu_count() or 2) // 2
+                max_workers = min(len(subtitle_tracks), max(jobs, 1))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {
+                        executor.submit(self._sync_one, mkv_file, track, temp_dir, options, reference): track
+                        for track in subtitle_tracks
+                    }
+                    for future in as_completed(futures):
+                        track = futures[future]
+                        try:
+                            result = future.result()
+                            if result is not None:
+                                description = f"[cyan]Synchronized track {track.track_id} ({track.language})[/cyan]"
+                            else:
+                                description = f"[red]Failed to synchronize track {track.track_id}[/red]"
+                        except subprocess.SubprocessError as e:
+                            description = f"[bold red]Error on track {track.track_id}: {e}[/bold red]"
+
+                        progress.update(task, advance=1, description=description)
+        finally:
+            # The raw audio stream can run to gigabytes per file; it has
+            # served its purpose once the sync phase ends, so never leave
+            # it behind in the persistent cache directory
+            if reference != mkv_file:
+                with contextlib.suppress(OSError):
+                    os.remove(reference)
+
+        # as_completed yields in completion order; return in track ID order
+        return [t for t in subtitle_tracks if t.corrected_path is not None]
+
+    @staticmethod
+    def _files_identical(path_a: str, path_b: str) -> bool:
+        """
+        Check whether two files have identical contents.
+
+        Sizes are compared first so mismatched files cost two stat calls;
+        equal-sized files are compared chunk by chunk, which short-circuits
+        on the first differing block.
+
+        Args:
+            path_a: Path to the first file
+            path_b: Path to the second file
+
+        Returns:
+            True if both files exist and hold the same bytes
+        """
+        try:
+            if os.stat(path_a).st_size != os.stat(path_b).st_size:
+                return False
+            with open(path_a, "rb") as fa, open(path_b, "rb") as fb:
+                while True:
+                    block_a = fa.read(1 << 16)
+                    if block_a != fb.read(1 << 16):
+                        return False
+                    if not block_a:
+                        return True
+        except OSError:
+            return False
+
+    def export_subtitles(self, mkv_file: str, subtitle_tracks: List[SubtitleTrack]) -> List[str]:
+        """
+        Copy corrected subtitle files next to the source MKV (--subs-only).
+
+        Skipping the remux avoids rewriting the entire container — for a
+        large video that is by far the most expensive step — when all the
+        user wants is the corrected subtitle files themselves.
+
+        Args:
+            mkv_file: Path to the source MKV file
+            subtitle_tracks: List of SubtitleTrack objects with corrected_path set
+
+        Returns:
+            List of paths the corrected subtitles were saved to
+        """
+        base = os.path.splitext(mkv_file)[0]
+        exported = []
+        for track in subtitle_tracks:
+            dest = f"{base}.{track.track_id}.{track.language}.corrected.{track.extension}"
+            shutil.copy(track.corrected_path, dest)
+            exported.append(dest)
+        return exported
+
+    def create_new_mkv(self, mkv_file: str, subtitle_tracks: List[SubtitleTrack],
+                       keep_track_ids: Optional[List[int]] = None) -> Optional[str]:
+        """
+        Create a new MKV file with the original video and corrected subtitles.
+
+        Args:
+            mkv_file: Path to the original MKV file
+            subtitle_tracks: List of SubtitleTrack objects with corrected_path set
+            keep_track_ids: IDs of subtitle tracks to copy unchanged from the
+                source container instead of re-adding from corrected files
+
+        Returns:
+            Path to the new MKV file, or None if creation failed
+        """
+        # Generate output filename based on input file
+        output_file = os.path.splitext(mkv_file)[0] + ".corrected.mkv"
+        
+        # Check if file already exists and warn user (batch mode overwrites)
+        if os.path.exists(output_file) and not self.batch_mode:
+            overwrite = self._ask_yes_no(
+                "File Exists",
+                f"The output file already exists:\n{output_file}\n\nDo you want to overwrite it?"
+            )
+            if not overwrite:
+                # Let user choose a new filename
+                if self.root is not None:
+                    from tkinter import filedialog
+                    new_output = filedialog.asksaveasfilename(
+                        title="Save corrected MKV as",
+                        initialfile=os.path.basename(output_file),
+                        defaultextension=".mkv",
+                        filetypes=[("MKV files", "*.mkv")]
+                    )
+                else:
+                    new_output = self.console.input("Save corrected MKV as: ").strip()
+                if not new_output:
+                    return None
+                output_file = new_output
+        
+        # Stage the remux in --work-dir / ALASS_TEMP_DIR when set (e.g. a
+        # local SSD while the source lives on a NAS) so the heavy write
+        # doesn't compete with reading the source, then move into place
+        staging_dir = self.work_dir or os.environ.get("ALASS_TEMP_DIR")
+        mux_target = output_file
+        if staging_dir and os.path.isdir(staging_dir):
+            mux_target = os.path.join(staging_dir, os.path.basename(output_file))
+
+        try:
+            # Build the mkvmerge arguments. Subtitle tracks alass left
+            # untouched are copied straight from the source container via a
+            # whitelist; everything else comes from the corrected files
+            # --quiet stops mkvmerge computing and printing progress we
+            # discard anyway (stdout goes to DEVNULL)
+            if keep_track_ids:
+                mux_args = ["--quiet", "-o", mux_target,
+                            "--subtitle-tracks", ",".join(map(str, keep_track_ids)), mkv_file]
+            else:
+                mux_args = ["--quiet", "-o", mux_target, "--no-subtitles", mkv_file]
+            
+            # Add each corrected subtitle file; tracks arrive already sorted
+            # by numeric ID from get_subtitle_tracks, preserving track order
+            for track in subtitle_tracks:
+                # Start with language and default-track settings
+                mux_args.extend([
+                    "--language", f"0:{track.language}",
+                    "--default-track", "0:no"  # Set default track flag to 'no'
+                ])
+
+                # Add track name if it exists
+                if track.track_name:
+                    mux_args.extend(["--track-name", f"0:{track.track_name}"])
+
+                # Forward boolean track properties that differ from their
+                # defaults, driven by the declarative flag table
+                if track.properties:
+                    mux_args.extend(
+                        arg
+                        for prop, flag, value, default in _MUX_FLAG_TABLE
+                        if bool(track.properties.get(prop, default)) != default
+                        for arg in (flag, value)
+                    )
+
+                mux_args.append(track.corrected_path)
+
+            # Pass the arguments through a JSON argfile (mkvmerge @file).
+            # This sidesteps command-line length limits and quoting issues
+            # with many tracks or unicode track names, and keeps the spawned
+            # argv tiny on Windows where CreateProcess parsing is costly.
+            argfile = tempfile.NamedTemporaryFile(
+                mode="w", suffix=".json", encoding="utf-8", delete=False)
+            try:
+                with argfile:
+                    json.dump(mux_args, argfile)
+                subprocess.run([self.tools.mkvmerge, f"@{argfile.name}"],
+                               check=True, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL)
+            finally:
+                with contextlib.suppress(OSError):
+                    os.unlink(argfile.name)
+
+            if mux_target != output_file:
+                shutil.move(mux_target, output_file)
+
+            return output_file
+        except subprocess.SubprocessError as e:
+            self.console.print(f"[bold red]Error creating new MKV file: {e}[/bold red]")
+            self._show_error("Error", f"Failed to create new MKV: {e}")
+            return None
+        except OSError as e:
+            self.console.print(f"[bold red]Error moving new MKV into place: {e}[/bold red]")
+            self._show_error("Error", f"Failed to move new MKV into place: {e}")
+            return None
+    
+    def display_options_panel(self, options: SyncOptions):
+        """Display the selected synchronization options in a panel."""
+        option_text = Text()
+        option_text.append("Synchronization Options:\n", style="bold yellow")
+        if options.no_splits:
+            option_text.append("• No Splits Mode: ", style="bold cyan")
+            option_text.append("Enabled (only constant time shifts will be applied)\n")
+        elif options.split_penalty is not None:
+            option_text.append("• Split Penalty: ", style="bold cyan")
+            option_text.append(f"{options.split_penalty} (higher values avoid splits)\n")
+        else:
+            option_text.append("• Split Penalty: ", style="bold cyan")
+            option_text.append(f"Default ({DEFAULT_SPLIT_PENALTY})\n")
+        if options.subs_only:
+            option_text.append("• Output: ", style="bold cyan")
+            option_text.append("Corrected subtitle files only (no remux)\n")
+        self.console.print(Panel(option_text, border_style="cyan"))
+    
+    @staticmethod
+    def _cache_dir_for(mkv_file: str) -> str:
+        """
+        Return a persistent working directory for the given MKV file.
+
+        The directory is keyed by the file's size, mtime and stem, so
+        re-running on an unchanged MKV (e.g. while tuning the split penalty)
+        finds the extracted and corrected subtitles from the previous run,
+        while any change to the source invalidates the cache naturally.
+
+        Args:
+            mkv_file: Path to the MKV file
+
+        Returns:
+            Path to the (created) cache directory
+        """
+        st = os.stat(mkv_file)
+        cache_dir = CACHE_ROOT / f"{st.st_size}_{int(st.st_mtime)}_{Path(mkv_file).stem}"
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        return str(cache_dir)
+
+    def run(self):
+        """Run the main application."""
+        # Display app header
+        self.console.print(Panel.fit(
+            "[bold blue]alass4Container[/bold blue]",
+            border_style="cyan"
+        ))
+
+        # Check for required tools
+        if not self.check_tools():
+            return 1
+
+        # Select MKV file
+        mkv_file = self.select_mkv_file()
+        self.console.print(f"Selected: [bold green]{mkv_file}[/bold green]")
+
+        # Get user options (unless already given on the command line)
+        if not self.options_from_cli:
+            self.options = self.get_options()
+
+        # Display options
+        self.display_options_panel(self.options)
+
+        return self.process_file(mkv_file)
+
+    def process_file(self, mkv_file: str) -> int:
+        """
+        Run the extract → synchronize → remux pipeline for one MKV file.
+
+        Uses the already-configured tools and options, so it can be called
+        either from the interactive run() flow or from a batch worker.
+
+        Args:
+            mkv_file: Path to the MKV file to process
+
+        Returns:
+            0 on success, 1 on failure
+        """
+        # Use a persistent per-file cache directory so repeat runs skip
+        # extraction and synchronization; fall back to a temporary
+        # directory when caching is disabled
+        with contextlib.ExitStack() as stack:
+            try:
+                # Setting up the work directory stats the source file, so
+                # it belongs inside the error handling: a vanished or
+                # mistyped path should report, not traceback
+                if os.environ.get("ALASS4C_NO_CACHE"):
+                    temp_dir = stack.enter_context(
+                        tempfile.TemporaryDirectory(dir=_ramdisk()))
+                else:
+                    temp_dir = self._cache_dir_for(mkv_file)
+                # Get subtitle tracks
+                with self.console.status("[cyan]Analyzing MKV file...[/cyan]", spinner="dots"):
+                    self.subtitle_tracks = self.get_subtitle_tracks(mkv_file)
+                
+                if not self.subtitle_tracks:
+                    self.console.print("[bold red]No subtitle tracks found in the MKV file.[/bold red]")
+                    self._show_info("No Subtitles", "No subtitle tracks found in the selected MKV file.")
+                    return 0
+                
+                # Display found tracks in a nice format
+                self.console.print(f"[bold green]Found {len(self.subtitle_tracks)} subtitle tracks:[/bold green]")
+                for track in self.subtitle_tracks:
+                    self.console.print(
+                        f"  [cyan]•[/cyan] Track [bold]{track.track_id}[/bold]: "
+                        f"Language=[yellow]{track.language}[/yellow], "
+                        f"Name={track.track_name or 'N/A'}, "
+                        f"Codec=[italic]{track.codec}[/italic]"
+                    )
+                
+                # Extract subtitles
+                extracted_tracks = self.extract_subtitles(mkv_file, self.subtitle_tracks, temp_dir)
+                
+                if not extracted_tracks:
+                    self.console.print("[bold red]Failed to extract any subtitle tracks.[/bold red]")
+                    self._show_warning("Extraction Failed", "Failed to extract any subtitle tracks from the MKV file.")
+                    return 1
+                
+                # Synchronize subtitles
+                corrected_tracks = self.synchronize_subtitles(mkv_file, extracted_tracks, temp_dir, self.options)
+                
+                if not corrected_tracks:
+                    self.console.print("[bold red]Failed to synchronize any subtitle tracks.[/bold red]")
+                    self._show_warning("Synchronization Failed", "Failed to synchronize any subtitle tracks.")
+                    return 1
+                
+                # Tracks alass left byte-identical don't need remux work:
+                # keep the originals in the container instead of re-adding
+                # copies, and skip the remux entirely if nothing changed
+                unchanged = [
+                    t for t in corrected_tracks
+                    if t.file_path and self._files_identical(t.file_path, t.corrected_path)
+                ]
+                if unchanged and not self.options.subs_only:
+                    for track in unchanged:
+                        self.console.print(
+                            f"  [green]•[/green] Track {track.track_id} ({track.language}) "
+                            "is already in sync; keeping the original"
+                        )
+                    corrected_tracks = [t for t in corrected_tracks if t not in unchanged]
+                    if not corrected_tracks:
+                        self.console.print("[bold green]All subtitle tracks are already in sync; nothing to do.[/bold green]")
+                        self._show_info("Already in Sync", "All subtitle tracks are already in sync. No output file was created.")
+                        return 0
+
+                # Either copy the corrected files next to the source, or
+                # remux them into a new MKV. Skipping the remux avoids
+                # rewriting the whole container just to update subtitles.
+                if self.options.subs_only:
+                    exported = self.export_subtitles(mkv_file, corrected_tracks)
+                    result_text = "Done! Corrected subtitles saved as:\n" + "\n".join(
+                        f"[bold green]{path}[/bold green]" for path in exported)
+                    self.console.print(Panel(result_text, title="[bold green]Success[/bold green]", border_style="green"))
+                    self._show_info("Success", "Done! Corrected subtitles saved as:\n" + "\n".join(exported))
+                    return 0
+
+                # Create new MKV with corrected subtitles
+                self.console.print("\n[bold]Creating new MKV with corrected subtitles...[/bold]")
+                with self.console.status("[cyan]Remuxing MKV file...[/cyan]", spinner="dots"):
+                    output_file = self.create_new_mkv(
+                        mkv_file, corrected_tracks,
+                        keep_track_ids=[t.track_id for t in unchanged])
+
+                if output_file:
+                    result_text = f"Done! Corrected MKV saved as:\n[bold green]{output_file}[/bold green]"
+                    self.console.print(Panel(result_text, title="[bold green]Success[/bold green]", border_style="green"))
+                    self._show_info("Success", f"Done! Corrected MKV saved as:\n{output_file}")
+                    return 0
+                else:
+                    self.console.print("[bold red]Failed to create the output MKV file.[/bold red]")
+                    return 1
+            
+            except Exception as e:
+                error_msg = f"An unexpected error occurred: {e}"
+                self.console.print(f"[bold red]{error_msg}[/bold red]")
+                self._show_error("Error", error_msg)
+                return 1
+        
+        return 0
+
+def _process_one(mkv_file: str, split_penalty: Optional[float], no_splits: bool,
+                 work_dir: Optional[str] = None, subs_only: bool = False) -> int:
+    """
+    Batch-mode worker: process a single MKV file with fixed options.
+
+    Runs in its own process, so it builds its own AlassContainer with a
+    quiet console (the batch driver prints one result line per file).
+
+    Args:
+        mkv_file: Path to the MKV file to process
+        split_penalty: alass split penalty, or None for the default
+        no_splits: Whether to only apply constant time shifts
+        work_dir: Optional staging directory for the remux output
+        subs_only: Whether to export subtitle files instead of remuxing
+
+    Returns:
+        0 on success, 1 on failure
+    """
+    app = AlassContainer()
+    app.console = Console(quiet=True)
+    app.batch_mode = True
+    app.work_dir = work_dir
+    app._tk_failed = True  # never open dialogs from a worker process
+
+    app.tools.mkvmerge = app.find_tool("mkvmerge")
+    app.tools.mkvextract = app.find_tool("mkvextract")
+    app.tools.alass = app.find_tool("alass") or app.find_tool("alass-cli")
+    if not app.tools.all_found():
+        return 1
+
+    app.options = SyncOptions(split_penalty=split_penalty, no_splits=no_splits,
+                              subs_only=subs_only)
+    try:
+        return app.process_file(mkv_file)
+    except SystemExit as e:
+        # Interactive error paths exit the process; in a pool worker that
+        # SystemExit would tear through run_batch's result loop, so turn
+        # it into a per-file failure code instead
+        return e.code if isinstance(e.code, int) else 1
+
+def run_batch(args) -> int:
+    """
+    Process every MKV file in a directory with a pool of worker processes.
+
+    Workers are capped at half the CPU count so each alass child still has
+    cores to run on.
+
+    Args:
+        args: Parsed command-line arguments with batch, split_penalty and
+            no_splits set
+
+    Returns:
+        0 if every file succeeded, 1 otherwise
+    """
+    console = Console()
+
+    # Skip this tool's own outputs, so re-running --batch on the same
+    # directory doesn't process first-run results into *.corrected.corrected
+    mkv_files = sorted(p for p in Path(args.batch).glob("*.mkv")
+                       if not p.stem.endswith(".corrected"))
+    if not mkv_files:
+        console.print(f"[bold red]No MKV files found in {args.batch}[/bold red]")
+        return 1
+
+    console.print(f"[bold green]Processing {len(mkv_files)} MKV files...[/bold green]")
+
+    failures = 0
+    max_workers = max((os.cpu_count() or 2) // 2, 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_process_one, str(mkv_file), args.split_penalty,
+                            args.no_splits, args.work_dir, args.subs_only): mkv_file
+            for mkv_file in mkv_files
+        }
+        for future in as_completed(futures):
+            mkv_file = futures[future]
+            try:
+                code = future.result()
+            except Exception as e:
+                console.print(f"  [red]✗[/red] {mkv_file.name}: {e}")
+                failures += 1
+                continue
+            if code == 0:
+                console.print(f"  [green]✓[/green] {mkv_file.name}")
+            else:
+                console.print(f"  [red]✗[/red] {mkv_file.name}")
+                failures += 1
+
+    if failures:
+        console.print(f"[bold red]{failures} of {len(mkv_files)} files failed.[/bold red]")
+        return 1
+    return 0
+
+def main():
+    """Main entry point for the application."""
+    parser = argparse.ArgumentParser(
+        description="Synchronize subtitle tracks inside an MKV container using alass."
+    )
+    parser.add_argument("--batch", metavar="DIR",
+                        help="process every *.mkv in DIR instead of showing a file picker")
+    parser.add_argument("--split-penalty", type=float, default=None,
+                        help="alass split penalty (0-1000, higher avoids splits)")
+    parser.add_argument("--no-splits", action="store_true",
+                        help="only apply constant time shifts")
+    parser.add_argument("--subs-only", action="store_true",
+                        help="only export corrected subtitle files next to the "
+                             "source, skipping the remux")
+    parser.add_argument("--work-dir", metavar="DIR", default=None,
+                        help="stage the remuxed MKV in DIR (e.g. a local SSD) "
+                             "before moving it next to the source")
+    args = parser.parse_args()
+
+    if args.batch:
+        return run_batch(args)
+
+    app = AlassContainer()
+    app.work_dir = args.work_dir
+    if args.split_penalty is not None or args.no_splits or args.subs_only:
+        app.options = SyncOptions(split_penalty=args.split_penalty, no_splits=args.no_splits,
+                                  subs_only=args.subs_only)
+        app.options_from_cli = True
+    return app.run()
+
+if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file